@@ -0,0 +1,132 @@
+import asyncio
+import os
+import socket
+import time
+from contextlib import asynccontextmanager
+from pathlib import Path
+from typing import TYPE_CHECKING, Any, AsyncIterator, Dict, List, Optional
+
+if TYPE_CHECKING:
+    from playwright.async_api import BrowserContext, Page
+
+POOL_PORT_FILENAME: str = "cdp.port"
+DEFAULT_POOL_PORT: int = 9333
+DEFAULT_PAGE_LIMIT: int = 4
+DEFAULT_IDLE_TTL_SECONDS: float = 15 * 60
+REAPER_INTERVAL_SECONDS: float = 30
+
+
+def _port_is_open(port: int) -> bool:
+    try:
+        with socket.create_connection(("localhost", port), timeout=0.5):
+            return True
+    except OSError:
+        return False
+
+
+def read_pool_port(user_data_dir: Path) -> Optional[int]:
+    """Returns the CDP port of a running pooled browser, or None if there is none.
+
+    Reading the port counts as using the pool, so it also resets the idle timer.
+    """
+    port_file = user_data_dir / POOL_PORT_FILENAME
+    try:
+        port = int(port_file.read_text().strip())
+    except (OSError, ValueError):
+        return None
+    if not _port_is_open(port):
+        port_file.unlink(missing_ok=True)
+        return None
+    port_file.touch()
+    return port
+
+
+async def keep_pool_alive(user_data_dir: Path) -> None:
+    """Keeps resetting the pool's idle timer until cancelled.
+
+    Clients run this while attached, so a long batch or an idle shell session
+    doesn't have its browser closed under it.
+    """
+    port_file = user_data_dir / POOL_PORT_FILENAME
+    while True:
+        await asyncio.sleep(REAPER_INTERVAL_SECONDS)
+        try:
+            os.utime(port_file)
+        except OSError:
+            return  # The pool has shut down; don't recreate its port file.
+
+
+class PagePool:
+    """Lends out pages of one BrowserContext, at most `limit` at a time.
+
+    Pages are opened on demand and handed back for reuse, so a run opens at most
+    `limit` pages no matter how many chats it downloads.
+    """
+
+    __slots__ = ("context", "_limit", "_pages", "_opening", "_idle")
+
+    def __init__(
+        self, context: "BrowserContext", limit: int = DEFAULT_PAGE_LIMIT
+    ) -> None:
+        self.context = context
+        self._limit = limit
+        self._pages: List["Page"] = []
+        self._opening = 0
+        self._idle: asyncio.Queue["Page"] = asyncio.Queue()
+
+    @asynccontextmanager
+    async def page(self) -> AsyncIterator["Page"]:
+        if self._idle.empty() and len(self._pages) + self._opening < self._limit:
+            self._opening += 1
+            try:
+                page = await self.context.new_page()
+            finally:
+                self._opening -= 1
+            self._pages.append(page)
+        else:
+            page = await self._idle.get()
+        try:
+            yield page
+        finally:
+            self._idle.put_nowait(page)
+
+    async def close(self) -> None:
+        for page in self._pages:
+            await page.close()
+        self._pages.clear()
+
+
+async def serve_pool(
+    user_data_dir: Path,
+    context_options: Dict[str, Any],
+    port: int = DEFAULT_POOL_PORT,
+    idle_ttl: float = DEFAULT_IDLE_TTL_SECONDS,
+) -> None:
+    """Runs a headless browser that CLI invocations attach to over CDP.
+
+    The browser is closed once no client has used it for `idle_ttl` seconds.
+    """
+    from playwright.async_api import async_playwright
+
+    port_file = user_data_dir / POOL_PORT_FILENAME
+    options = dict(context_options)
+    options["args"] = [*options.get("args", []), f"--remote-debugging-port={port}"]
+    async with async_playwright() as p:
+        context = await p.chromium.launch_persistent_context(
+            user_data_dir=user_data_dir, headless=True, **options
+        )
+        port_file.write_text(str(port))
+        try:
+            while True:
+                try:
+                    last_used = port_file.stat().st_mtime
+                except OSError:
+                    # A client found the browser unreachable and removed the file,
+                    # or it was deleted by hand; either way, shut down.
+                    break
+                if time.time() - last_used >= idle_ttl:
+                    break
+                await asyncio.sleep(min(idle_ttl, REAPER_INTERVAL_SECONDS))
+        finally:
+            port_file.unlink(missing_ok=True)
+            await context.close()
@@ -1,60 +1,408 @@
+import asyncio
+import json
 import re
+import time
 from pathlib import Path
 from types import TracebackType
-from typing import Any, Dict, List, Optional, Self
+from typing import (
+    TYPE_CHECKING,
+    Any,
+    BinaryIO,
+    Callable,
+    Dict,
+    Final,
+    List,
+    Optional,
+    Self,
+)
 
-from bs4 import BeautifulSoup, NavigableString
-from playwright.async_api import BrowserContext, Error, Locator, Page, async_playwright
-from playwright_stealth import Stealth
+from playwright.async_api import (
+    BrowserContext,
+    Error,
+    Page,
+    async_playwright,
+)
+
+from chat_librarian.browser_pool import (
+    DEFAULT_PAGE_LIMIT,
+    PagePool,
+    keep_pool_alive,
+    read_pool_port,
+)
+
+if TYPE_CHECKING:
+    from lxml import html as lxml_html
 
 USER_DATA_DIR: Path = Path.home() / ".chat_scraper_data"
 CHATGPT_URL: str = "https://chat.openai.com"
 OUTPUT_DIR: Path = Path.cwd() / "ChatGPT_Downloads"
+OUTPUT_BUFFER_SIZE: int = 1 << 16
+CHAT_INDEX_PATH: Path = USER_DATA_DIR / "chatgpt_chats.json"
+# The cached chat list is reused while the newest chats in the sidebar still match.
+CHAT_INDEX_FINGERPRINT_SIZE: int = 5
+# A chat list saved or confirmed this recently is used without reading the sidebar.
+CHAT_INDEX_TTL_SECONDS: float = 5 * 60
+# How long to wait for the sidebar to lazy-load more chats after each scroll.
+SCROLL_SETTLE_TIMEOUT_MS: int = 1000
+SCROLL_MAX_STALE_ROUNDS: int = 5
+# A conversation counts as rendered once its DOM has been quiet for this long.
+CONTENT_QUIET_MS: int = 250
+# Pages that never go quiet (e.g. a still-streaming reply) are read after this.
+CONTENT_MAX_WAIT_MS: int = 15000
 HISTORY_CONTAINER_SELECTOR: str = "div#history"
 CHAT_LINK_SELECTOR: str = 'a[href^="/c/"]'
 MESSAGE_AUTHOR_BLOCK_SELECTOR: str = "div[data-message-author-role]"
+# Shared by standalone runs and the pooled browser so both look the same to the site.
+PERSISTENT_CONTEXT_OPTIONS: Dict[str, Any] = {
+    "args": ["--disable-blink-features=AutomationControlled"],
+    "user_agent": "Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/125.0.0.0 Safari/537.36",
+    "viewport": {"width": 1920, "height": 1080},
+    "screen": {"width": 1920, "height": 1080},
+    "java_script_enabled": True,
+}
+# Headless runs only scrape text, so Chromium itself skips loading images. Routing
+# requests through Playwright instead would intercept every request and turn off
+# the HTTP cache, so each chat load would fetch the app's whole bundle again.
+HEADLESS_CONTEXT_OPTIONS: Dict[str, Any] = {
+    **PERSISTENT_CONTEXT_OPTIONS,
+    "args": [
+        *PERSISTENT_CONTEXT_OPTIONS["args"],
+        "--blink-settings=imagesEnabled=false",
+    ],
+}
+# Message text lives in the first "markdown" div, or in a "whitespace-pre-wrap"
+# div for plain user messages.
+CONTENT_CONTAINER_SELECTORS: tuple[str, ...] = (
+    "div.markdown",
+    "div.whitespace-pre-wrap",
+)
+CODE_LANGUAGE_CLASS_PATTERN: re.Pattern[str] = re.compile(r"(?:^|\s)language-(\S*)")
+
+# In-page scripts that read every chat link / message block in a single CDP call
+# instead of one round-trip per element.
+CHAT_RECORDS_SCRIPT: str = """([historySel, linkSel, limit]) => {
+    const history = document.querySelector(historySel);
+    if (!history) return [];
+    const links = Array.from(history.querySelectorAll(linkSel)).slice(0, limit);
+    return links.map((a) => ({
+        href: a.getAttribute("href"),
+        title: a.innerText,
+    }));
+}"""
+# Shared by the sidebar scripts below; expects `history`, `linkSel` and `timeoutMs`
+# in scope. scrollForMore() jumps the list's nearest scrollable ancestor to the
+# bottom, without a mouse or layout pass through scrollIntoView, then waits on a
+# MutationObserver. It resolves with the new link count as soon as new links
+# arrive, or with the old one after `timeoutMs` if none do.
+_SIDEBAR_SCROLL_JS: str = """
+    const links = () => history.querySelectorAll(linkSel);
+    let scroller = history;
+    while (scroller && scroller.scrollHeight <= scroller.clientHeight) {
+        scroller = scroller.parentElement;
+    }
+    const waitForMore = (before) =>
+        new Promise((resolve) => {
+            const observer = new MutationObserver(() => {
+                const now = links().length;
+                if (now !== before) {
+                    observer.disconnect();
+                    clearTimeout(timer);
+                    resolve(now);
+                }
+            });
+            const timer = setTimeout(() => {
+                observer.disconnect();
+                resolve(before);
+            }, timeoutMs);
+            observer.observe(history, { childList: true, subtree: true });
+        });
+    const scrollForMore = () => {
+        const current = links();
+        if (scroller) scroller.scrollTop = scroller.scrollHeight;
+        else current[current.length - 1]?.scrollIntoView({ block: "end" });
+        return waitForMore(current.length);
+    };
+"""
+# Scrolls the sidebar until `maxStaleRounds` scrolls in a row load no new chats,
+# then returns every chat link.
+SCROLL_AND_LIST_CHATS_SCRIPT: str = (
+    """async (args) => {
+    const [historySel, linkSel, timeoutMs, maxStaleRounds] = args;
+    const history = document.querySelector(historySel);
+    if (!history) return [];
+"""
+    + _SIDEBAR_SCROLL_JS
+    + """
+    let count = links().length;
+    for (let stale = 0; stale < maxStaleRounds; ) {
+        const now = await scrollForMore();
+        stale = now === count ? stale + 1 : 0;
+        count = now;
+    }
+    return Array.from(links()).map((a) => ({
+        href: a.getAttribute("href"),
+        title: a.innerText,
+    }));
+}"""
+)
+# Looks a title up in the sidebar, scrolling in more chats only until it shows up
+# or `maxStaleRounds` scrolls in a row load no new chats. Only links that arrived
+# since the last check are searched; within a batch the last match wins, as in
+# the title index built by list_chats. Titles are compared with toLowerCase(),
+# which folds the same way as str.lower() in _title_key.
+FIND_CHAT_BY_TITLE_SCRIPT: str = (
+    """async (args) => {
+    const [historySel, linkSel, title, timeoutMs, maxStaleRounds] = args;
+    const history = document.querySelector(historySel);
+    if (!history) return null;
+"""
+    + _SIDEBAR_SCROLL_JS
+    + """
+    const findFrom = (start) => {
+        const batch = Array.from(links()).slice(start);
+        const match = batch.findLast(
+            (a) => a.innerText.trim().toLowerCase() === title
+        );
+        if (!match) return null;
+        return { href: match.getAttribute("href"), title: match.innerText.trim() };
+    };
+    let count = links().length;
+    let found = findFrom(0);
+    for (let stale = 0; !found && stale < maxStaleRounds; ) {
+        const now = await scrollForMore();
+        stale = now === count ? stale + 1 : 0;
+        found = findFrom(count);
+        count = now;
+    }
+    return found;
+}"""
+)
+# Resolves once `main` has gone `quietMs` without a DOM mutation. ChatGPT keeps
+# sockets and beacons open, so "networkidle" is not a usable readiness signal.
+WAIT_FOR_QUIET_DOM_SCRIPT: str = """([quietMs, maxMs]) =>
+    new Promise((resolve) => {
+        const root = document.querySelector("main") || document.body;
+        let timer;
+        const observer = new MutationObserver(() => {
+            clearTimeout(timer);
+            timer = setTimeout(done, quietMs);
+        });
+        const deadline = setTimeout(() => done(), maxMs);
+        const done = () => {
+            observer.disconnect();
+            clearTimeout(timer);
+            clearTimeout(deadline);
+            resolve();
+        };
+        observer.observe(root, { childList: true, subtree: true, characterData: true });
+        timer = setTimeout(done, quietMs);
+    })"""
+# Only the message's content container crosses CDP, not its toolbar and icon markup.
+MESSAGE_RECORDS_SCRIPT: str = """([blockSel, contentSels]) =>
+    Array.from(document.querySelectorAll(blockSel)).map((b) => {
+        const role = b.getAttribute("data-message-author-role");
+        for (const contentSel of contentSels) {
+            const content = b.querySelector(contentSel);
+            if (content) return { role, html: content.outerHTML };
+        }
+        return { role, html: "" };
+    })"""
+# One round-trip per chat: waits for the conversation to settle, then reads it.
+READ_SETTLED_MESSAGES_SCRIPT: str = f"""async (args) => {{
+    const [quietMs, maxMs, blockSel, contentSels] = args;
+    await ({WAIT_FOR_QUIET_DOM_SCRIPT})([quietMs, maxMs]);
+    return ({MESSAGE_RECORDS_SCRIPT})([blockSel, contentSels]);
+}}"""
+
+
+# Pre-encoded pieces of each "### Role\n\n<text>\n\n---\n" block in the output.
+_ASSISTANT_HEADER: bytes = b"### Assistant\n\n"
+_ROLE_HEADERS: Dict[Optional[str], bytes] = {"user": b"### User\n\n"}
+_BLOCK_END: bytes = b"\n\n---\n"
+_BLOCK_SEPARATOR: bytes = b"\n"
+
+_FILENAME_BAD_CHARS: Dict[int, Optional[int]] = str.maketrans("", "", '\\/*?:"<>|')
 
 
 def _sanitize_filename(name: str) -> str:
-    name = re.sub(r'[\\/*?:"<>|]', "", name)
-    return name.strip()
+    return name.translate(_FILENAME_BAD_CHARS).strip()
+
+
+def _load_chat_index() -> Optional[Dict[str, Any]]:
+    try:
+        index = json.loads(CHAT_INDEX_PATH.read_text(encoding="utf-8"))
+    except (OSError, ValueError):
+        return None
+    return index if isinstance(index, dict) else None
+
+
+def _cached_chats(fingerprint: List[str]) -> Optional[List[Dict[str, Any]]]:
+    """Returns the saved chat list if the sidebar still starts with the same chats."""
+    chat_index = _load_chat_index()
+    if chat_index and chat_index.get("fingerprint") == fingerprint:
+        cached_chats: List[Dict[str, Any]] = chat_index["chats"]
+        # A confirmed list counts as fresh again.
+        try:
+            CHAT_INDEX_PATH.touch()
+        except OSError:
+            pass
+        return cached_chats
+    return None
+
+
+def _fresh_cached_chats() -> Optional[List[Dict[str, Any]]]:
+    """Returns the saved chat list if it was saved or confirmed within the TTL."""
+    try:
+        age = time.time() - CHAT_INDEX_PATH.stat().st_mtime
+    except OSError:
+        return None
+    if age >= CHAT_INDEX_TTL_SECONDS:
+        return None
+    chat_index = _load_chat_index()
+    if chat_index and "chats" in chat_index:
+        cached_chats: List[Dict[str, Any]] = chat_index["chats"]
+        return cached_chats
+    return None
+
+
+def _discard_chat_index() -> None:
+    try:
+        CHAT_INDEX_PATH.unlink(missing_ok=True)
+    except OSError as e:
+        print(f"Warning: Could not remove the chat index: {e}")
+
+
+def _save_chat_index(fingerprint: List[str], chats: List[Dict[str, Any]]) -> None:
+    try:
+        CHAT_INDEX_PATH.parent.mkdir(parents=True, exist_ok=True)
+        CHAT_INDEX_PATH.write_text(
+            json.dumps({"fingerprint": fingerprint, "chats": chats}), encoding="utf-8"
+        )
+    except OSError as e:
+        print(f"Warning: Could not save the chat index: {e}")
+
+
+def _title_key(title: str) -> str:
+    # Not casefold(): the sidebar script has no equivalent, and every lookup path
+    # must fold titles the same way. str.lower() and JS toLowerCase() agree.
+    return title.lower()
+
+
+def _index_chats_by_title(chats: List[Dict[str, Any]]) -> Dict[str, Dict[str, Any]]:
+    # Built in reverse so that when titles repeat, the first chat in the list wins.
+    return {_title_key(chat["title"]): chat for chat in reversed(chats)}
+
+
+def _paragraph_to_markdown(element: "lxml_html.HtmlElement") -> str:
+    text: str = element.text_content()
+    return text
+
+
+def _list_to_markdown(element: "lxml_html.HtmlElement") -> str:
+    prefix = "1." if element.tag == "ol" else "*"
+    return "\n".join(
+        f"{prefix} {li.text_content().strip()}" for li in element.findall("li")
+    )
+
+
+def _code_block_to_markdown(element: "lxml_html.HtmlElement") -> str:
+    code_language_div = element.find(".//div")
+    code_language = ""
+    if code_language_div is not None:
+        match = CODE_LANGUAGE_CLASS_PATTERN.search(code_language_div.get("class", ""))
+        if match:
+            code_language = match.group(1)
+    code_element = element.find(".//code")
+    code_text = code_element.text_content() if code_element is not None else ""
+    return f"```{code_language}\n{code_text}\n```"
+
+
+def _heading_to_markdown(element: "lxml_html.HtmlElement") -> str:
+    level = int(element.tag[1])
+    return f"{'#' * level} {element.text_content()}"
+
+
+_MARKDOWN_HANDLERS: Dict[str, Callable[["lxml_html.HtmlElement"], str]] = {
+    "p": _paragraph_to_markdown,
+    "ol": _list_to_markdown,
+    "ul": _list_to_markdown,
+    "pre": _code_block_to_markdown,
+    "h1": _heading_to_markdown,
+    "h2": _heading_to_markdown,
+    "h3": _heading_to_markdown,
+    "h4": _heading_to_markdown,
+}
 
 
 class ChatDownloader:
+    # Fixed attributes keep lookups in the per-chat loops off a per-instance dict.
+    __slots__ = (
+        "connect_port",
+        "is_first_run",
+        "p",
+        "context",
+        "page",
+        "uses_pool",
+        "title_index",
+        "_modal_dismissal",
+        "_pool_keepalive",
+    )
+
+    ACTION_TIMEOUT: Final[int] = 90000
+
     def __init__(self, connect_port: Optional[int], is_first_run: bool):
         self.connect_port = connect_port
         self.is_first_run = is_first_run
         self.p = None
         self.context: Optional[BrowserContext] = None
         self.page: Optional[Page] = None
-        self.ACTION_TIMEOUT = 90000
+        self.uses_pool = False
+        self.title_index: Dict[str, Dict[str, Any]] = {}
+        self._modal_dismissal: Optional[asyncio.Task[None]] = None
+        self._pool_keepalive: Optional[asyncio.Task[None]] = None
 
     async def __aenter__(self) -> Self:
         """Initializes the browser and logs in with the most robust headless settings."""
         self.p = await async_playwright().start()
         if self.p is None:
             raise RuntimeError("Playwright initialization failed.")
+        # Only needed once a browser is up; keeps it off the CLI's import path.
+        from playwright_stealth import Stealth
+
         stealth = Stealth()
 
+        # Prefer a warm pooled browser over a cold launch. The visible first-run
+        # login always needs its own browser.
+        if not self.connect_port and not self.is_first_run:
+            self.connect_port = read_pool_port(USER_DATA_DIR)
+            self.uses_pool = self.connect_port is not None
+            if self.uses_pool:
+                print(f"Using pooled browser on port {self.connect_port}.")
+
         if self.connect_port:
             endpoint_url = f"http://localhost:{self.connect_port}"
             browser = await self.p.chromium.connect_over_cdp(endpoint_url)
             self.context = browser.contexts[0]
             await stealth.apply_stealth_async(self.context)
-            self.page = (
-                self.context.pages[0]
-                if self.context.pages
-                else await self.context.new_page()
-            )
+            # The pooled browser is shared between runs, so never borrow its tabs.
+            if self.uses_pool:
+                self.page = await self.context.new_page()
+            else:
+                self.page = (
+                    self.context.pages[0]
+                    if self.context.pages
+                    else await self.context.new_page()
+                )
         else:
             self.context = await self.p.chromium.launch_persistent_context(
                 user_data_dir=USER_DATA_DIR,
                 headless=not self.is_first_run,
-                args=["--disable-blink-features=AutomationControlled"],
-                user_agent="Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/125.0.0.0 Safari/537.36",
-                viewport={"width": 1920, "height": 1080},
-                screen={"width": 1920, "height": 1080},
-                java_script_enabled=True,
+                # The visible login keeps images so the page looks normal.
+                **(
+                    PERSISTENT_CONTEXT_OPTIONS
+                    if self.is_first_run
+                    else HEADLESS_CONTEXT_OPTIONS
+                ),
             )
             await stealth.apply_stealth_async(self.context)
             self.page = (
@@ -65,151 +413,364 @@ class ChatDownloader:
 
         self.page.set_default_timeout(self.ACTION_TIMEOUT)
 
-        await self.page.goto(CHATGPT_URL, wait_until="domcontentloaded")
+        # Every later step waits for the element it needs, so there is no reason
+        # to block on the full document load here.
+        await self.page.goto(CHATGPT_URL, wait_until="commit")
+
+        # Waiting out the modal check would delay every run by its full timeout
+        # when there is no modal. Reading the sidebar doesn't need the modal gone,
+        # and clicks retry until nothing covers their target, so check alongside.
+        self._modal_dismissal = asyncio.create_task(
+            self._dismiss_welcome_modal(self.page)
+        )
+        if self.uses_pool:
+            self._pool_keepalive = asyncio.create_task(keep_pool_alive(USER_DATA_DIR))
 
-        print("Checking for and dismissing any post-login modals...")
+        return self
+
+    async def _dismiss_welcome_modal(self, page: Page) -> None:
+        # Runs in the background while the CLI may be prompting, so it stays quiet.
         try:
-            dismiss_button = self.page.get_by_role("button", name="Okay, let’s go")
+            dismiss_button = page.get_by_role("button", name="Okay, let’s go")
             await dismiss_button.click(timeout=5000)
-            print("Dismissed a welcome modal.")
         except Error:
-            print("No initial modal found. Continuing.")
-
-        return self
+            pass  # No welcome modal this time.
 
     async def __aexit__(
         self,
         exc_type: Optional[type[BaseException]],
         exc_val: Optional[BaseException],
         exc_tb: Optional[TracebackType],
-    ) -> Optional[bool]:
+    ) -> None:
+        # Returns None so that errors raised in a session reach the CLI.
+        for task in (self._modal_dismissal, self._pool_keepalive):
+            if task:
+                task.cancel()
+                await asyncio.gather(task, return_exceptions=True)
+        if self.uses_pool and self.page:
+            await self.page.close()
         if self.context and not self.connect_port:
             await self.context.close()
-            return True  # TODO: Verify correctness of the return value
         if self.p:
             await self.p.stop()
-            return True  # TODO: Verify correctness of the return value
-        return False  # TODO: Verify correctness of the return value
 
-    async def list_chats(self) -> List[Dict[str, Any]]:
+    async def list_chats(self, refresh: bool = False) -> List[Dict[str, Any]]:
+        """Returns all chats in the sidebar, reusing the cached list when possible.
+
+        With `refresh`, the sidebar is always scrolled and the cache rewritten.
+        """
+        fresh_chats = None if refresh else _fresh_cached_chats()
+        if fresh_chats is not None:
+            print(f"Using {len(fresh_chats)} chats cached in the last few minutes.")
+            self.title_index = _index_chats_by_title(fresh_chats)
+            return fresh_chats
         print("Waiting for chat history to be fully loaded...")
         if self.page is None:
             raise RuntimeError("Page is not initialized")
-        history_container = self.page.locator(HISTORY_CONTAINER_SELECTOR)
-        chat_links_locator = history_container.locator(CHAT_LINK_SELECTOR)
-        await chat_links_locator.first.wait_for()
+        fingerprint = await self._sidebar_fingerprint()
+        cached_chats = None if refresh else _cached_chats(fingerprint)
+        if cached_chats is not None:
+            print(f"Chat history unchanged. Using {len(cached_chats)} cached chats.")
+            self.title_index = _index_chats_by_title(cached_chats)
+            return cached_chats
         print("Chat history is loaded. Scrolling to reveal all conversations...")
-        last_count = 0
-        scroll_attempts = 0
-        max_scroll_attempts = 5
-        while scroll_attempts < max_scroll_attempts:
-            await chat_links_locator.last.hover()
-            await self.page.mouse.wheel(0, 1000)
-            await self.page.wait_for_timeout(1500)
-            current_count = await chat_links_locator.count()
-            print(f"  ...found {current_count} chats so far.")
-            if current_count == last_count:
-                scroll_attempts += 1
-            else:
-                scroll_attempts = 0
-            last_count = current_count
-        print(f"Finished scrolling. Total chats found: {last_count}")
-        all_chats = await chat_links_locator.all()
-        chat_data = []
-        for i, chat_locator in enumerate(all_chats):
-            try:
-                title = await chat_locator.inner_text()
-                if title:
-                    chat_data.append(
-                        {"index": i, "title": title.strip(), "locator": chat_locator}
-                    )
-            except Error:
-                print(f"Warning: Could not read title for chat at index {i}. Skipping.")
-        return sorted(chat_data, key=lambda x: x["index"], reverse=True)
+        chat_records: List[Dict[str, str]] = await self.page.evaluate(
+            SCROLL_AND_LIST_CHATS_SCRIPT,
+            [
+                HISTORY_CONTAINER_SELECTOR,
+                CHAT_LINK_SELECTOR,
+                SCROLL_SETTLE_TIMEOUT_MS,
+                SCROLL_MAX_STALE_ROUNDS,
+            ],
+        )
+        print(f"Finished scrolling. Total chats found: {len(chat_records)}")
+        chat_data: List[Dict[str, Any]] = []
+        for i, record in enumerate(chat_records):
+            title = record["title"]
+            if title:
+                chat_data.append(
+                    {
+                        "index": i,
+                        "title": title.strip(),
+                        "href": record["href"],
+                    }
+                )
+        chat_data.sort(key=lambda x: x["index"], reverse=True)
+        _save_chat_index(fingerprint, chat_data)
+        self.title_index = _index_chats_by_title(chat_data)
+        return chat_data
+
+    async def _newest_sidebar_chats(self, limit: int) -> List[Dict[str, str]]:
+        if self.page is None:
+            raise RuntimeError("Page is not initialized")
+        history_container = self.page.locator(HISTORY_CONTAINER_SELECTOR)
+        await history_container.locator(CHAT_LINK_SELECTOR).first.wait_for(
+            state="attached"
+        )
+        newest_chats: List[Dict[str, str]] = await self.page.evaluate(
+            CHAT_RECORDS_SCRIPT,
+            [HISTORY_CONTAINER_SELECTOR, CHAT_LINK_SELECTOR, limit],
+        )
+        return newest_chats
 
-    async def download_chat_by_title(self, target_title: str) -> Path:
-        all_chats = await self.list_chats()
+    async def _sidebar_fingerprint(self) -> List[str]:
+        newest_chats = await self._newest_sidebar_chats(CHAT_INDEX_FINGERPRINT_SIZE)
+        return [record["href"] for record in newest_chats]
+
+    async def first_chat(self) -> Optional[Dict[str, str]]:
+        """Returns the most recent chat, the top sidebar link, without scrolling."""
+        for record in await self._newest_sidebar_chats(1):
+            title = record["title"].strip()
+            if title:
+                return {"title": title, "href": record["href"]}
+        return None
+
+    async def _find_chat_in_sidebar(
+        self, target_title: str, max_stale_rounds: int
+    ) -> Optional[Dict[str, str]]:
+        if self.page is None:
+            raise RuntimeError("Page is not initialized")
+        history_container = self.page.locator(HISTORY_CONTAINER_SELECTOR)
+        await history_container.locator(CHAT_LINK_SELECTOR).first.wait_for(
+            state="attached"
+        )
+        found_chat: Optional[Dict[str, str]] = await self.page.evaluate(
+            FIND_CHAT_BY_TITLE_SCRIPT,
+            [
+                HISTORY_CONTAINER_SELECTOR,
+                CHAT_LINK_SELECTOR,
+                _title_key(target_title),
+                SCROLL_SETTLE_TIMEOUT_MS,
+                max_stale_rounds,
+            ],
+        )
+        return found_chat
+
+    async def download_chat_by_title(
+        self, target_title: str, refresh: bool = False
+    ) -> Path:
+        # Try the cheapest source first: a recently saved chat list, the chats
+        # already rendered, the cached chat list if it is still current, and
+        # only then scroll the sidebar, stopping as soon as the title turns up.
+        # With `refresh`, only the sidebar is searched and the saved list is
+        # dropped, so the next list_chats() re-reads the sidebar too.
+        not_found = ValueError(
+            f"No chat found with the exact title (case-insensitive): '{target_title}'"
+        )
         found_chat = None
-        for chat in all_chats:
-            if chat["title"].lower() == target_title.lower():
-                found_chat = chat
-                break
+        from_cache = False
+        if refresh:
+            _discard_chat_index()
+            self.title_index = {}
+        fresh_chats = None if refresh else _fresh_cached_chats()
+        if fresh_chats is not None:
+            self.title_index = _index_chats_by_title(fresh_chats)
+            found_chat = self.title_index.get(_title_key(target_title))
+            from_cache = found_chat is not None
         if not found_chat:
-            raise ValueError(
-                f"No chat found with the exact title (case-insensitive): '{target_title}'"
+            found_chat = await self._find_chat_in_sidebar(target_title, 0)
+        if not found_chat:
+            cached_chats = (
+                None if refresh else _cached_chats(await self._sidebar_fingerprint())
             )
+            if cached_chats is not None:
+                self.title_index = _index_chats_by_title(cached_chats)
+                found_chat = self.title_index.get(_title_key(target_title))
+                from_cache = found_chat is not None
+            else:
+                print(f"Scrolling the chat history for '{target_title}'...")
+                found_chat = await self._find_chat_in_sidebar(
+                    target_title, SCROLL_MAX_STALE_ROUNDS
+                )
+        if not found_chat:
+            raise not_found
+        try:
+            return await self.download_chat(
+                chat_title=found_chat["title"], chat_href=found_chat["href"]
+            )
+        except Error:
+            if not from_cache:
+                raise
+
+        # The cached link no longer loads (the chat was deleted or moved), so drop
+        # the cached list and look the title up in the live sidebar instead.
+        print(f"Cached link for '{target_title}' failed. Searching the sidebar...")
+        _discard_chat_index()
+        self.title_index = {}
+        found_chat = await self._find_chat_in_sidebar(
+            target_title, SCROLL_MAX_STALE_ROUNDS
+        )
+        if not found_chat:
+            raise not_found
         return await self.download_chat(
-            chat_title=found_chat["title"], chat_locator=found_chat["locator"]
+            chat_title=found_chat["title"], chat_href=found_chat["href"]
         )
 
-    async def download_chat(self, chat_title: str, chat_locator: Locator) -> Path:
+    async def download_chat(self, chat_title: str, chat_href: str) -> Path:
         print(f"Targeting chat: '{chat_title}'")
-        await chat_locator.click()
-        downloaded_content = await self._extract_conversation_content(self.page)
+        if self.page is None:
+            raise RuntimeError("Page is not initialized")
+        # Clicking a rendered sidebar link is a cheap in-app navigation; chats that
+        # came from the cached index may not be rendered, so load those directly.
+        # Once a chat is on screen, an in-app switch leaves its messages in the DOM
+        # for a moment after the URL changes, and the content wait below would
+        # read them. A full load replaces the document, so use that instead.
+        chat_link = self.page.locator(HISTORY_CONTAINER_SELECTOR).locator(
+            f'a[href="{chat_href}"]'
+        )
+        shows_chat = await self.page.locator(MESSAGE_AUTHOR_BLOCK_SELECTOR).count()
+        if not shows_chat and await chat_link.count():
+            await chat_link.first.click()
+            await self.page.wait_for_url(f"**{chat_href}", wait_until="commit")
+        else:
+            response = await self.page.goto(
+                f"{CHATGPT_URL}{chat_href}", wait_until="commit"
+            )
+            if response is not None and not response.ok:
+                raise Error(
+                    f"Could not load chat '{chat_title}' (HTTP {response.status})."
+                )
+        message_records = await self._extract_conversation_content(self.page)
+        # Parsing and writing are blocking, so keep them off the event loop.
+        return await asyncio.to_thread(
+            self._save_chat_content, chat_title, message_records
+        )
+
+    async def download_chats(
+        self,
+        titles: List[str],
+        concurrency: int = DEFAULT_PAGE_LIMIT,
+        on_saved: Optional[Callable[[Path], None]] = None,
+        refresh: bool = False,
+        on_started: Optional[Callable[[int], None]] = None,
+    ) -> List[Path]:
+        """Downloads several chats at once over up to `concurrency` reused pages.
+
+        `on_started` is called with the number of distinct chats to download once
+        the titles are resolved, and `on_saved` with each file's path as soon as
+        that chat is saved.
+        `refresh` re-reads the chat list from the sidebar instead of the cache.
+        """
+        if self.context is None:
+            raise RuntimeError("Browser context is not initialized")
+        await self.list_chats(refresh)
+        # Keyed by href, so titles that name the same chat download it only once.
+        targets: Dict[str, Dict[str, Any]] = {}
+        missing = []
+        for title in titles:
+            found_chat = self.title_index.get(_title_key(title))
+            if found_chat:
+                targets.setdefault(found_chat["href"], found_chat)
+            else:
+                missing.append(title)
+        if missing:
+            raise ValueError(
+                "No chat found with the exact title (case-insensitive): "
+                + ", ".join(f"'{title}'" for title in missing)
+            )
+
+        if on_started:
+            on_started(len(targets))
+        pages = PagePool(self.context, concurrency)
+
+        async def download_one(chat: Dict[str, Any]) -> Path:
+            async with pages.page() as page:
+                print(f"Targeting chat: '{chat['title']}'")
+                page.set_default_timeout(self.ACTION_TIMEOUT)
+                response = await page.goto(
+                    f"{CHATGPT_URL}{chat['href']}", wait_until="commit"
+                )
+                if response is not None and not response.ok:
+                    raise Error(
+                        f"Could not load chat '{chat['title']}' "
+                        f"(HTTP {response.status})."
+                    )
+                message_records = await self._extract_conversation_content(page)
+            # Parse in a worker thread so the other pages keep loading meanwhile.
+            saved_file_path = await asyncio.to_thread(
+                self._save_chat_content, chat["title"], message_records
+            )
+            if on_saved:
+                on_saved(saved_file_path)
+            return saved_file_path
+
+        # A TaskGroup cancels the other downloads as soon as one fails, so no page
+        # is still in use when the pool closes them.
+        try:
+            async with asyncio.TaskGroup() as downloads:
+                tasks = [
+                    downloads.create_task(download_one(chat))
+                    for chat in targets.values()
+                ]
+        except ExceptionGroup as failures:
+            # Report the first failure on its own, as callers expect.
+            raise failures.exceptions[0]
+        finally:
+            await pages.close()
+        return [task.result() for task in tasks]
+
+    def _save_chat_content(
+        self, chat_title: str, message_records: List[Dict[str, str]]
+    ) -> Path:
         safe_title = _sanitize_filename(chat_title)
         output_path = OUTPUT_DIR / f"{safe_title}.md"
         OUTPUT_DIR.mkdir(exist_ok=True)
-        with open(output_path, "w", encoding="utf-8") as f:
-            f.write(f"# {chat_title}\n\n{downloaded_content}")
+        with open(output_path, "wb", buffering=OUTPUT_BUFFER_SIZE) as f:
+            f.write(f"# {chat_title}\n\n".encode("utf-8"))
+            self._write_conversation(f, message_records)
         return output_path
 
-    async def _extract_conversation_content(self, page: Page) -> str:
+    async def _extract_conversation_content(self, page: Page) -> List[Dict[str, str]]:
         print("Waiting for chat content to be fully loaded...")
-        await page.locator(MESSAGE_AUTHOR_BLOCK_SELECTOR).first.wait_for()
-        await page.wait_for_load_state("networkidle", timeout=30000)
+        # The scripts below read the DOM directly, so visibility does not matter.
+        await page.locator(MESSAGE_AUTHOR_BLOCK_SELECTOR).first.wait_for(
+            state="attached"
+        )
+        message_records: List[Dict[str, str]] = await page.evaluate(
+            READ_SETTLED_MESSAGES_SCRIPT,
+            [
+                CONTENT_QUIET_MS,
+                CONTENT_MAX_WAIT_MS,
+                MESSAGE_AUTHOR_BLOCK_SELECTOR,
+                CONTENT_CONTAINER_SELECTORS,
+            ],
+        )
         print("Chat content is loaded.")
-        formatted_text: list[str] = []
-        message_blocks = await page.locator(MESSAGE_AUTHOR_BLOCK_SELECTOR).all()
-        print(f"Parsing content from {len(message_blocks)} message blocks...")
-        for i, block in enumerate(message_blocks):
-            role = await block.get_attribute("data-message-author-role")
-            role_display = "User" if role == "user" else "Assistant"
-            html_content = await block.inner_html()
-            soup = BeautifulSoup(html_content, "lxml")
-            content_container = soup.find("div", class_="markdown") or soup.find(
-                "div", class_="whitespace-pre-wrap"
-            )
+        return message_records
+
+    def _write_conversation(
+        self, f: BinaryIO, message_records: List[Dict[str, str]]
+    ) -> None:
+        """Parses each message block and writes it out as soon as it is ready."""
+        # Only needed once there is a chat to convert; keeps it off the CLI's
+        # import path.
+        from lxml import html as lxml_html
+
+        print(f"Parsing content from {len(message_records)} message blocks...")
+        for i, record in enumerate(message_records):
             content_text = ""
-            if content_container:
-                content_text = self._parse_soup_to_markdown(content_container)
-            formatted_text.append(f"### {role_display}\n\n{content_text}\n\n---\n")
+            if record["html"]:
+                content_container = lxml_html.fragment_fromstring(record["html"])
+                content_text = self._parse_html_to_markdown(content_container)
+            if i:
+                f.write(_BLOCK_SEPARATOR)
+            f.write(_ROLE_HEADERS.get(record["role"], _ASSISTANT_HEADER))
+            f.write(content_text.encode("utf-8"))
+            f.write(_BLOCK_END)
             if (i + 1) % 5 == 0:
-                print(f"  ...parsed message {i + 1}/{len(message_blocks)}")
-        return "\n".join(formatted_text)
+                print(f"  ...parsed message {i + 1}/{len(message_records)}")
 
-    def _parse_soup_to_markdown(self, soup_container: BeautifulSoup) -> str:
+    def _parse_html_to_markdown(self, container: "lxml_html.HtmlElement") -> str:
         content_parts = []
-        for element in soup_container.contents:
-            if isinstance(element, NavigableString) and element.strip():
-                content_parts.append(element.strip())
-                continue
-            if not hasattr(element, "name"):
-                continue
-            if element.name == "p":
-                content_parts.append(element.get_text())
-            elif element.name in ["ol", "ul"]:
-                list_items = []
-                for li in element.find_all("li", recursive=False):
-                    prefix = "1." if element.name == "ol" else "*"
-                    li_text = li.get_text().strip()
-                    list_items.append(f"{prefix} {li_text}")
-                content_parts.append("\n".join(list_items))
-            elif element.name == "pre":
-                code_language_div = element.find("div")
-                code_language = ""
-                if code_language_div and code_language_div.get("class"):
-                    lang_class = [
-                        c
-                        for c in code_language_div["class"]
-                        if c.startswith("language-")
-                    ]
-                    if lang_class:
-                        code_language = lang_class[0].replace("language-", "")
-                code_text = (
-                    element.find("code").get_text() if element.find("code") else ""
-                )
-                content_parts.append(f"```{code_language}\n{code_text}\n```")
-            elif element.name in ["h1", "h2", "h3", "h4"]:
-                level = int(element.name[1])
-                content_parts.append(f"{'#' * level} {element.get_text()}")
+        if container.text and container.text.strip():
+            content_parts.append(container.text.strip())
+        for element in container:
+            # Comments and processing instructions have a non-string tag, so they
+            # never match a handler.
+            handler = _MARKDOWN_HANDLERS.get(element.tag)
+            if handler:
+                content_parts.append(handler(element))
+            tail = element.tail
+            if tail and tail.strip():
+                content_parts.append(tail.strip())
         return "\n\n".join(part for part in content_parts if part)
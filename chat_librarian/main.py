@@ -1,13 +1,24 @@
 import asyncio
-from typing import Optional
+import sys
+from typing import TYPE_CHECKING, Any, Callable, Coroutine, List, Optional
 
 import typer
-from playwright.async_api import Error
 from rich.console import Console
 from rich.panel import Panel
-from rich.table import Table
 
-from chat_librarian.downloader import ChatDownloader
+# Playwright and the downloader are imported inside the commands that use them,
+# so --help and argument errors never load the browser stack.
+from chat_librarian.browser_pool import (
+    DEFAULT_IDLE_TTL_SECONDS,
+    DEFAULT_PAGE_LIMIT,
+    DEFAULT_POOL_PORT,
+    serve_pool,
+)
+
+if TYPE_CHECKING:
+    from pathlib import Path
+
+    from chat_librarian.downloader import ChatDownloader
 
 app = typer.Typer(
     name="chat-librarian",
@@ -17,66 +28,200 @@ app = typer.Typer(
 )
 console = Console()
 
+# Fixed panels are built once at import and printed as often as needed.
+FIRST_RUN_PANEL = Panel(
+    "[bold yellow]ACTION REQUIRED[/bold yellow]\n\nA browser window will open. Please log in to your OpenAI account. The script will continue automatically after you're logged in.",
+    title="First-Time Setup",
+)
+SHELL_HELP_PANEL = Panel(
+    "Commands: [bold]select[/bold], [bold]last[/bold], "
+    "[bold]title <chat title>[/bold], [bold]quit[/bold]",
+    title="Chat Librarian Shell",
+)
 
-async def run_interactive_session(port: Optional[int], first_run: bool) -> None:
-    """Handles the interactive chat selection and download."""
-    async with ChatDownloader(connect_port=port, is_first_run=first_run) as downloader:
-        with console.status("[bold green]Fetching chat list..."):
-            chats = await downloader.list_chats()
 
-        if not chats:
-            console.print("[bold red]No chats found in the sidebar.[/bold red]")
-            return
+def _maybe_first_run_panel(first_run: bool) -> None:
+    """Asks the user to log in before the visible first-run browser opens."""
+    if first_run:
+        console.print(FIRST_RUN_PANEL)
+
+
+def _success_panel(saved_file_path: "Path") -> Panel:
+    return Panel(
+        f"[bold green]✅ Success![/bold green]\n\nConversation saved to:\n[cyan]{saved_file_path}[/cyan]",
+        title="Download Complete",
+        border_style="green",
+    )
+
+
+def _error_panel(error: Exception, title: str = "Download Failed") -> Panel:
+    return Panel(
+        f"[bold red]❌ An Error Occurred[/bold red]\n\n[white]{error}[/white]",
+        title=title,
+        border_style="red",
+    )
+
+
+def _event_loop_factory() -> Optional[Callable[[], asyncio.AbstractEventLoop]]:
+    """Returns uvloop's loop factory if the optional `fast` extra is installed."""
+    try:
+        import uvloop
+    except ImportError:
+        return None
+    loop_factory: Callable[[], asyncio.AbstractEventLoop] = uvloop.new_event_loop
+    return loop_factory
+
+
+def _run_async(
+    session: Coroutine[Any, Any, None],
+    failure_title: str = "Download Failed",
+    cancelled_message: str = "Operation cancelled by user.",
+) -> None:
+    """Runs a command's session, reporting errors and Ctrl+C the same way for all."""
+    from playwright.async_api import Error
+
+    try:
+        with asyncio.Runner(loop_factory=_event_loop_factory()) as runner:
+            runner.run(session)
+    except (Error, ValueError) as e:
+        console.print(_error_panel(e, failure_title))
+        raise typer.Exit(code=1)
+    except KeyboardInterrupt:
+        console.print(f"\n[bold yellow]{cancelled_message}[/bold yellow]")
+
+
+def _blocking_prompt(text: str, prompt_suffix: str) -> str:
+    answer: str = typer.prompt(text, prompt_suffix=prompt_suffix)
+    return answer
 
-        table = Table(
-            title="Available ChatGPT Conversations",
-            show_header=True,
-            header_style="bold magenta",
-        )
-        table.add_column("#", style="dim", width=4)
-        table.add_column("Title")
 
-        for i, chat in enumerate(chats, 1):
-            table.add_row(str(i), chat["title"])
+async def _prompt(text: str, prompt_suffix: str = ": ") -> str:
+    """Reads a line like typer.prompt, without blocking the event loop on a terminal.
 
-        console.print(table)
+    The browser session keeps processing events while the user types.
+    """
+    # A thread parked in input() would hold stdin's buffer lock, and CPython aborts
+    # at exit if Ctrl+C leaves it there. So wait for the terminal to have a line
+    # ready instead, and only then read it. Piped input needs no waiting, and
+    # event loops without add_reader (Windows) can't watch stdin, so both block.
+    if not sys.stdin.isatty():
+        return _blocking_prompt(text, prompt_suffix)
+    loop = asyncio.get_running_loop()
+    stdin_fd = sys.stdin.fileno()
+    while True:
+        line_ready: asyncio.Future[None] = loop.create_future()
+
+        def mark_ready() -> None:
+            if not line_ready.done():
+                line_ready.set_result(None)
 
         try:
-            choice_str = typer.prompt(
-                "\nEnter the number of the chat to download (or 'q' to quit)"
-            )
-            if choice_str.lower() == "q":
-                console.print("Quitting.")
-                return
-
-            choice = int(choice_str) - 1
-            if not 0 <= choice < len(chats):
-                console.print("[bold red]Invalid selection.[/bold red]")
-                return
-
-            selected_chat = chats[choice]
-
-            with console.status(
-                f"[bold green]Downloading '{selected_chat['title']}'..."
-            ):
-                saved_file_path = await downloader.download_chat(
-                    chat_title=selected_chat["title"],
-                    chat_locator=selected_chat["locator"],
-                )
+            loop.add_reader(stdin_fd, mark_ready)
+        except NotImplementedError:
+            return _blocking_prompt(text, prompt_suffix)
+        try:
+            typer.echo(f"{text}{prompt_suffix}", nl=False)
+            await line_ready
+        finally:
+            loop.remove_reader(stdin_fd)
+        line = sys.stdin.readline()
+        if not line:
+            typer.echo()
+            raise typer.Abort()  # End of input, as typer.prompt reports it.
+        # Like typer.prompt, ask again on an empty answer.
+        if line.rstrip("\r\n"):
+            return line.rstrip("\r\n")
+
+
+async def _do_select(downloader: "ChatDownloader", refresh: bool = False) -> None:
+    """Lists the chats and downloads the one the user picks."""
+    with console.status("[bold green]Fetching chat list..."):
+        chats = await downloader.list_chats(refresh)
+
+    if not chats:
+        console.print("[bold red]No chats found in the sidebar.[/bold red]")
+        return
+
+    from rich.table import Table
+
+    table = Table(
+        title="Available ChatGPT Conversations",
+        show_header=True,
+        header_style="bold magenta",
+    )
+    table.add_column("#", style="dim", width=4)
+    table.add_column("Title")
+
+    for i, chat in enumerate(chats, 1):
+        table.add_row(str(i), chat["title"])
+
+    console.print(table)
 
-            console.print(
-                Panel(
-                    f"[bold green]✅ Success![/bold green]\n\nConversation saved to:\n[cyan]{saved_file_path}[/cyan]",
-                    title="Download Complete",
-                    border_style="green",
-                )
-            )
+    try:
+        choice_str = await _prompt(
+            "\nEnter the number of the chat to download (or 'q' to quit)"
+        )
+        if choice_str.lower() == "q":
+            console.print("Quitting.")
+            return
 
-        except (ValueError, IndexError):
-            console.print(
-                "[bold red]Invalid input. Please enter a number from the list.[/bold red]"
+        choice = int(choice_str) - 1
+        if not 0 <= choice < len(chats):
+            console.print("[bold red]Invalid selection.[/bold red]")
+            return
+
+        selected_chat = chats[choice]
+
+        with console.status(f"[bold green]Downloading '{selected_chat['title']}'..."):
+            saved_file_path = await downloader.download_chat(
+                chat_title=selected_chat["title"],
+                chat_href=selected_chat["href"],
             )
 
+        console.print(_success_panel(saved_file_path))
+
+    except (ValueError, IndexError):
+        console.print(
+            "[bold red]Invalid input. Please enter a number from the list.[/bold red]"
+        )
+
+
+async def _do_last(downloader: "ChatDownloader") -> None:
+    """Downloads the most recent chat."""
+    with console.status("[bold green]Finding the most recent chat..."):
+        latest_chat = await downloader.first_chat()
+
+    if not latest_chat:
+        console.print("[bold red]No chats found in the sidebar.[/bold red]")
+        return
+
+    with console.status(f"[bold green]Downloading '{latest_chat['title']}'..."):
+        saved_file_path = await downloader.download_chat(
+            chat_title=latest_chat["title"], chat_href=latest_chat["href"]
+        )
+
+    console.print(_success_panel(saved_file_path))
+
+
+async def _do_title(
+    downloader: "ChatDownloader", title: str, refresh: bool = False
+) -> None:
+    """Downloads the chat with the given title."""
+    with console.status(f"[bold green]Searching for chat titled '{title}'..."):
+        saved_file_path = await downloader.download_chat_by_title(title, refresh)
+
+    console.print(_success_panel(saved_file_path))
+
+
+async def run_interactive_session(
+    port: Optional[int], first_run: bool, refresh: bool = False
+) -> None:
+    """Handles the interactive chat selection and download."""
+    from chat_librarian.downloader import ChatDownloader
+
+    async with ChatDownloader(connect_port=port, is_first_run=first_run) as downloader:
+        await _do_select(downloader, refresh)
+
 
 @app.command(  # type: ignore[misc]
     name="select", help="Select a chat to download from an interactive list. [default]"
@@ -92,29 +237,16 @@ def select_chat(
         "--first-run",
         help="For standalone mode: Run in a visible browser for the first time.",
     ),
+    refresh: bool = typer.Option(
+        False,
+        "--refresh",
+        help="Re-read the chat list from the sidebar instead of the cache.",
+    ),
 ) -> None:
     """The default command, allowing interactive chat selection."""
-    if first_run:
-        console.print(
-            Panel(
-                "[bold yellow]ACTION REQUIRED[/bold yellow]\n\nA browser window will open. Please log in to your OpenAI account. The script will continue automatically after you're logged in.",
-                title="First-Time Setup",
-            )
-        )
+    _maybe_first_run_panel(first_run)
 
-    try:
-        asyncio.run(run_interactive_session(port, first_run))
-    except Error as e:
-        console.print(
-            Panel(
-                f"[bold red]❌ An Error Occurred[/bold red]\n\n[white]{e}[/white]",
-                title="Download Failed",
-                border_style="red",
-            )
-        )
-        raise typer.Exit(code=1)
-    except KeyboardInterrupt:
-        console.print("\n[bold yellow]Operation cancelled by user.[/bold yellow]")
+    _run_async(run_interactive_session(port, first_run, refresh))
 
 
 @app.command(name="last", help="Quickly download the most recent chat.")  # type: ignore[misc]
@@ -131,52 +263,17 @@ def download_last(
     ),
 ) -> None:
     """Downloads the most recent chat non-interactively."""
-    if first_run:
-        console.print(
-            Panel(
-                "[bold yellow]ACTION REQUIRED[/bold yellow]\n\nA browser window will open. Please log in to your OpenAI account. The script will continue automatically after you're logged in.",
-                title="First-Time Setup",
-            )
-        )
+    from chat_librarian.downloader import ChatDownloader
+
+    _maybe_first_run_panel(first_run)
 
     async def run_last_session() -> None:
         async with ChatDownloader(
             connect_port=port, is_first_run=first_run
         ) as downloader:
-            with console.status("[bold green]Fetching chat list..."):
-                chats = await downloader.list_chats()
+            await _do_last(downloader)
 
-            if not chats:
-                console.print("[bold red]No chats found in the sidebar.[/bold red]")
-                return
-
-            latest_chat = chats[0]
-            with console.status(f"[bold green]Downloading '{latest_chat['title']}'..."):
-                saved_file_path = await downloader.download_chat(
-                    chat_title=latest_chat["title"], chat_locator=latest_chat["locator"]
-                )
-
-            console.print(
-                Panel(
-                    f"[bold green]✅ Success![/bold green]\n\nConversation saved to:\n[cyan]{saved_file_path}[/cyan]",
-                    title="Download Complete",
-                    border_style="green",
-                )
-            )
-
-    try:
-        asyncio.run(run_last_session())
-    except Error as e:
-        console.print(
-            Panel(
-                f"[bold red]❌ An Error Occurred[/bold red]\n\n[white]{e}[/white]",
-                title="Download Failed",
-                border_style="red",
-            )
-        )
-        raise typer.Exit(code=1)
-    except KeyboardInterrupt:
-        console.print("\n[bold yellow]Operation cancelled by user.[/bold yellow]")
+    _run_async(run_last_session())
 
 
 @app.command(  # type: ignore[misc]
@@ -194,44 +291,187 @@ def by_title(
         "--first-run",
         help="For standalone mode: Run in a visible browser for the first time.",
     ),
+    refresh: bool = typer.Option(
+        False,
+        "--refresh",
+        help="Re-read the chat list from the sidebar instead of the cache.",
+    ),
 ) -> None:
     """Downloads a chat by matching its title."""
-    if first_run:
-        console.print(
-            Panel(
-                "[bold yellow]ACTION REQUIRED[/bold yellow]\n\nA browser window will open. Please log in to your OpenAI account. The script will continue automatically after you're logged in.",
-                title="First-Time Setup",
-            )
-        )
+    from chat_librarian.downloader import ChatDownloader
+
+    _maybe_first_run_panel(first_run)
 
     async def run_title_session() -> None:
         async with ChatDownloader(
             connect_port=port, is_first_run=first_run
         ) as downloader:
-            with console.status(f"[bold green]Searching for chat titled '{title}'..."):
-                saved_file_path = await downloader.download_chat_by_title(title)
+            await _do_title(downloader, title, refresh)
+
+    _run_async(run_title_session())
+
+
+@app.command(  # type: ignore[misc]
+    name="batch", help="Download several chats by title at the same time."
+)
+def batch(
+    titles: List[str] = typer.Argument(
+        ..., help="The exact, case-insensitive titles of the chats to download."
+    ),
+    concurrency: int = typer.Option(
+        DEFAULT_PAGE_LIMIT,
+        "--concurrency",
+        min=1,
+        help="How many chats to download at the same time.",
+    ),
+    port: Optional[int] = typer.Option(
+        None, "--port", help="Connect to a running Chrome instance on this port."
+    ),
+    first_run: bool = typer.Option(
+        False,
+        "--first-run",
+        help="For standalone mode: Run in a visible browser for the first time.",
+    ),
+    refresh: bool = typer.Option(
+        False,
+        "--refresh",
+        help="Re-read the chat list from the sidebar instead of the cache.",
+    ),
+) -> None:
+    """Downloads several chats by title, sharing one browser between them."""
+    from chat_librarian.downloader import ChatDownloader
+
+    _maybe_first_run_panel(first_run)
+
+    async def run_batch_session() -> None:
+        from rich.progress import Progress
+
+        async with ChatDownloader(
+            connect_port=port, is_first_run=first_run
+        ) as downloader:
+            with Progress(console=console) as progress:
+                # The total is only known once duplicate titles have been merged.
+                task = progress.add_task("Downloading chats...", total=None)
+                saved_file_paths = await downloader.download_chats(
+                    titles,
+                    concurrency,
+                    on_saved=lambda _: progress.advance(task),
+                    refresh=refresh,
+                    on_started=lambda count: progress.update(task, total=count),
+                )
 
+            saved_files = "\n".join(f"[cyan]{path}[/cyan]" for path in saved_file_paths)
             console.print(
                 Panel(
-                    f"[bold green]✅ Success![/bold green]\n\nConversation saved to:\n[cyan]{saved_file_path}[/cyan]",
+                    "[bold green]✅ Success![/bold green]\n\n"
+                    f"Conversations saved to:\n{saved_files}",
                     title="Download Complete",
                     border_style="green",
                 )
             )
 
-    try:
-        asyncio.run(run_title_session())
-    except (Error, ValueError) as e:
-        console.print(
-            Panel(
-                f"[bold red]❌ An Error Occurred[/bold red]\n\n[white]{e}[/white]",
-                title="Download Failed",
-                border_style="red",
-            )
+    _run_async(run_batch_session())
+
+
+@app.command(  # type: ignore[misc]
+    name="shell", help="Run several downloads in one browser session."
+)
+def shell(
+    port: Optional[int] = typer.Option(
+        None, "--port", help="Connect to a running Chrome instance on this port."
+    ),
+    first_run: bool = typer.Option(
+        False,
+        "--first-run",
+        help="For standalone mode: Run in a visible browser for the first time.",
+    ),
+    refresh: bool = typer.Option(
+        False,
+        "--refresh",
+        help="Re-read the chat list from the sidebar for the first select or title.",
+    ),
+) -> None:
+    """Keeps one browser open and runs select/last/title commands against it."""
+    from playwright.async_api import Error
+
+    from chat_librarian.downloader import ChatDownloader
+
+    _maybe_first_run_panel(first_run)
+
+    async def run_shell_session() -> None:
+        async with ChatDownloader(
+            connect_port=port, is_first_run=first_run
+        ) as downloader:
+            console.print(SHELL_HELP_PANEL)
+            # Only the first select or title bypasses the cached chat list; later
+            # lookups reuse the list that one re-read.
+            refresh_pending = refresh
+            while True:
+                try:
+                    line = await _prompt("chat-librarian", prompt_suffix="> ")
+                except typer.Abort:
+                    return
+                command, _, argument = line.strip().partition(" ")
+                command = command.lower()
+                try:
+                    if command in ("quit", "exit", "q"):
+                        return
+                    elif command == "select":
+                        use_refresh, refresh_pending = refresh_pending, False
+                        await _do_select(downloader, use_refresh)
+                    elif command == "last":
+                        await _do_last(downloader)
+                    elif command == "title" and argument.strip():
+                        use_refresh, refresh_pending = refresh_pending, False
+                        await _do_title(downloader, argument.strip(), use_refresh)
+                    else:
+                        console.print(
+                            "[bold red]Unknown command.[/bold red] "
+                            "Use select, last, title <chat title> or quit."
+                        )
+                except (Error, ValueError) as e:
+                    # Keep the session alive; only this command failed.
+                    console.print(_error_panel(e))
+
+    _run_async(run_shell_session())
+
+
+@app.command(  # type: ignore[misc]
+    name="pool", help="Keep a headless browser running for faster downloads."
+)
+def run_pool(
+    port: int = typer.Option(
+        DEFAULT_POOL_PORT,
+        "--port",
+        help="Remote debugging port for the pooled browser.",
+    ),
+    idle_minutes: float = typer.Option(
+        DEFAULT_IDLE_TTL_SECONDS / 60,
+        "--idle-minutes",
+        min=1,
+        help="Close the browser after this many minutes with no command attached.",
+    ),
+) -> None:
+    """Runs a long-lived browser that the other commands attach to."""
+    from chat_librarian.downloader import HEADLESS_CONTEXT_OPTIONS, USER_DATA_DIR
+
+    console.print(
+        Panel(
+            f"[bold green]Browser pool running on port {port}.[/bold green]\n\nOther commands will reuse it until it has been idle for {idle_minutes:g} minutes. Press Ctrl+C to stop it.",
+            title="Browser Pool",
         )
-        raise typer.Exit(code=1)
-    except KeyboardInterrupt:
-        console.print("\n[bold yellow]Operation cancelled by user.[/bold yellow]")
+    )
+
+    _run_async(
+        serve_pool(
+            USER_DATA_DIR,
+            HEADLESS_CONTEXT_OPTIONS,
+            port=port,
+            idle_ttl=idle_minutes * 60,
+        ),
+        failure_title="Browser Pool Failed",
+        cancelled_message="Browser pool stopped.",
+    )
 
 
 if __name__ == "__main__":